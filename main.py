@@ -134,43 +134,34 @@ def main(usar_fecha_actual: bool = True, retornar_json: bool = False, fecha_espe
                     resultado_insumo["movimientos_encontrados"] = int(movimientos_encontrados)
                     resultado_insumo["movimientos_no_encontrados"] = int(movimientos_no_encontrados)
                     
-                    # Contar por tipo de clasificación
-                    from src.procesamiento.procesador_arqueos import limpiar_valor_numerico
-                    for idx, row in registros_con_descuadre.iterrows():
-                        movimiento_encontrado = row.get('movimiento_encontrado', False)
-                        sobrante = limpiar_valor_numerico(row['sobrantes'])
-                        faltante = limpiar_valor_numerico(row['faltantes'])
-                        
-                        if sobrante != 0:
-                            if movimiento_encontrado:
-                                resultado_insumo["registros_actualizados"]["sobrante_contable"] += 1
-                            else:
-                                resultado_insumo["registros_actualizados"]["sobrante_en_arqueo"] += 1
-                        elif faltante != 0:
-                            if movimiento_encontrado:
-                                resultado_insumo["registros_actualizados"]["faltante_contable"] += 1
-                            else:
-                                resultado_insumo["registros_actualizados"]["faltante_en_arqueo"] += 1
+                    # Limpiar sobrantes y faltantes de todos los registros en una sola pasada
+                    from src.procesamiento.procesador_arqueos import limpiar_serie_numerica
+                    sobrantes_limpios = limpiar_serie_numerica(registros_con_descuadre['sobrantes']).tolist()
+                    faltantes_limpios = limpiar_serie_numerica(registros_con_descuadre['faltantes']).tolist()
                     
-                    # Agregar información detallada de cada registro
-                    for idx, row in registros_con_descuadre.iterrows():
+                    # Contar por tipo de clasificación y agregar información detallada de cada registro
+                    for (idx, row), sobrante, faltante in zip(
+                        registros_con_descuadre.iterrows(), sobrantes_limpios, faltantes_limpios
+                    ):
                         movimiento_encontrado = row.get('movimiento_encontrado', False)
-                        sobrante = limpiar_valor_numerico(row['sobrantes'])
-                        faltante = limpiar_valor_numerico(row['faltantes'])
                         
                         # Determinar justificacion y nuevo_estado según las reglas de negocio
                         if sobrante != 0:
                             if movimiento_encontrado:
+                                resultado_insumo["registros_actualizados"]["sobrante_contable"] += 1
                                 justificacion = 'SOBRANTE CONTABLE'
                                 nuevo_estado = 'SOBRANTE CONTABLE'
                             else:
+                                resultado_insumo["registros_actualizados"]["sobrante_en_arqueo"] += 1
                                 justificacion = 'SOBRANTE EN ARQUEO'
                                 nuevo_estado = 'SOBRANTE EN ARQUEO'
                         elif faltante != 0:
                             if movimiento_encontrado:
+                                resultado_insumo["registros_actualizados"]["faltante_contable"] += 1
                                 justificacion = 'FALTANTE CONTABLE'
                                 nuevo_estado = 'FALTANTE CONTABLE'
                             else:
+                                resultado_insumo["registros_actualizados"]["faltante_en_arqueo"] += 1
                                 justificacion = 'Fisico'
                                 nuevo_estado = 'FALTANTE EN ARQUEO'
                         else:
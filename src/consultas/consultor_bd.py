@@ -42,7 +42,73 @@ class ConsultorBD:
         if not self.admin_bd:
             raise ValueError("No se ha configurado el administrador de BD")
         return self.admin_bd.conectar()
-    
+
+    def _consultar_movimientos_lote(
+        self,
+        cuenta: int,
+        codofi_excluir: int,
+        nrocmp: int,
+        nits: List[int],
+        fechas: List[int]
+    ) -> pd.DataFrame:
+        """
+        Ejecuta la consulta de movimientos que comparten las búsquedas en lote: una cuenta y
+        un comprobante, para varios cajeros (NIT IN (...)) y fechas (FECHA IN (...)) a la vez.
+
+        Args:
+            cuenta: Número de cuenta
+            codofi_excluir: Código de oficina a excluir
+            nrocmp: Número de comprobante
+            nits: Códigos de cajero (NIT) a consultar
+            fechas: Fechas a consultar en formato YYYYMMDD (enteros)
+
+        Returns:
+            DataFrame con los movimientos encontrados, ordenados por FECHA DESC
+        """
+        consulta = f"""
+        SELECT  ANOELB,
+                MESELB,
+                DIAELB,
+                CODOFI,
+                (CLASE*100000000+GRUPO*10000000+CUENTA*100000+SUBCTA*1000+AUXBIC) AS CUENTA,
+                NIT,
+                NUMDOC,
+                NROCMP,
+                (ANOELB*10000+MESELB*100+DIAELB) AS FECHA,
+                VALOR
+        FROM gcolibranl.gcoffmvint
+        WHERE (CLASE*100000000+GRUPO*10000000+CUENTA*100000+SUBCTA*1000+AUXBIC IN ({cuenta}))
+          AND CODOFI <> {codofi_excluir}
+          AND NROCMP = {nrocmp}
+          AND NIT IN ({', '.join(str(nit) for nit in nits)})
+          AND (ANOELB*10000+MESELB*100+DIAELB) IN ({', '.join(str(fecha) for fecha in fechas)})
+        ORDER BY FECHA DESC
+        """
+        return self.admin_bd.consultar(consulta)
+
+    def _rango_solo_dia_arqueo(self, fecha_obj: datetime) -> tuple:
+        """
+        Rango de fechas que consulta consultar_movimientos_nacional con solo_dia_arqueo=True.
+
+        Salvo en enero, ese método también toma como inicio el mismo día del mes anterior
+        (o el último día de ese mes si el día no existe), así que la búsqueda abarca hasta
+        un mes hacia atrás. El lote reproduce ese rango para dar el mismo resultado.
+
+        Args:
+            fecha_obj: Fecha del arqueo
+
+        Returns:
+            Tupla (fecha_inicio, fecha_fin) como datetime
+        """
+        if fecha_obj.month == 1:
+            return fecha_obj, fecha_obj
+        try:
+            fecha_inicio = fecha_obj.replace(month=fecha_obj.month - 1)
+        except ValueError:
+            # Último día del mes anterior
+            fecha_inicio = fecha_obj.replace(day=1) - timedelta(days=1)
+        return fecha_inicio, fecha_obj
+
     def consultar_movimientos_nacional(
         self,
         codigo_cajero: int,
@@ -106,6 +172,8 @@ class ConsultorBD:
                 fecha_fin = fecha_formateada  # Fecha de arqueo (límite superior)
                 
                 # Calcular fecha de inicio (1 mes hacia atrás)
+            # Nota: este bloque también se ejecuta con solo_dia_arqueo=True y, salvo en enero,
+            # reemplaza fecha_inicio; consultar_movimientos_nacional_lote reproduce ese rango
             if fecha_obj.month == 1:
                 # Si es enero, el mes anterior es diciembre del año anterior
                 mes_anterior = 12
@@ -234,6 +302,101 @@ class ConsultorBD:
             logger.error(f"Error al consultar movimientos en BD: {e}")
             return None
     
+    def consultar_movimientos_nacional_lote(
+        self,
+        candidatos: List[tuple],
+        cuenta: int = 110505075,
+        codofi_excluir: int = 976,
+        nrocmp: int = 770500
+    ) -> Optional[Dict[tuple, Optional[Dict[str, Any]]]]:
+        """
+        Consulta en una sola ida a la base de datos los movimientos del día del arqueo
+        para varios cajeros.
+        
+        Equivale a llamar a consultar_movimientos_nacional(..., solo_dia_arqueo=True) por
+        cada candidato, pero con una única consulta que filtra por NIT IN (...) y FECHA IN (...).
+        Cada candidato se busca en el mismo rango de fechas que la consulta individual
+        (ver _rango_solo_dia_arqueo), de modo que ambas dan el mismo resultado.
+        
+        Args:
+            candidatos: Lista de tuplas (codigo_cajero, fecha_arqueo, valor_descuadre) con la
+                fecha en formato YYYY-MM-DD y el valor con el signo de la BD
+            cuenta: Número de cuenta (default: 110505075)
+            codofi_excluir: Código de oficina a excluir (default: 976)
+            nrocmp: Número de comprobante (default: 770500)
+        
+        Returns:
+            Diccionario {(codigo_cajero, fecha_arqueo, valor_descuadre): movimiento o None} con
+            una entrada por cada candidato, o None si no se pudo realizar la consulta
+        """
+        if not self.admin_bd:
+            logger.error("No se ha configurado el administrador de BD")
+            return None
+        
+        if not candidatos:
+            return {}
+        
+        try:
+            # Rango de fechas YYYYMMDD (enteros) de la consulta individual para cada candidato
+            candidatos_formateados = {}
+            rangos = {}
+            for codigo_cajero, fecha_arqueo, valor_descuadre in candidatos:
+                if fecha_arqueo not in rangos:
+                    rangos[fecha_arqueo] = self._rango_solo_dia_arqueo(datetime.strptime(fecha_arqueo, '%Y-%m-%d'))
+                fecha_inicio, fecha_fin = rangos[fecha_arqueo]
+                candidatos_formateados[(codigo_cajero, fecha_arqueo, valor_descuadre)] = (
+                    int(codigo_cajero),
+                    int(fecha_inicio.strftime('%Y%m%d')),
+                    int(fecha_fin.strftime('%Y%m%d'))
+                )
+            nits = sorted({nit for nit, _, _ in candidatos_formateados.values()})
+            fechas = sorted({
+                int(fecha.strftime('%Y%m%d'))
+                for fecha_inicio, fecha_fin in rangos.values()
+                for fecha in pd.date_range(fecha_inicio, fecha_fin)
+            })
+            
+            logger.debug(
+                f"Consultando movimientos NACIONAL del día del arqueo en lote para "
+                f"{len(candidatos_formateados)} candidatos ({len(nits)} cajeros, {len(fechas)} fechas)"
+            )
+            
+            # Ejecutar consulta
+            df = self._consultar_movimientos_lote(cuenta, codofi_excluir, nrocmp, nits, fechas)
+            
+            # Posiciones de los movimientos de cada NIT, en el orden de la consulta (FECHA DESC)
+            posiciones_por_nit = {}
+            if not df.empty:
+                for posicion, nit in enumerate(df['NIT'].tolist()):
+                    posiciones_por_nit.setdefault(int(nit), []).append(posicion)
+                fechas_movimiento = [int(fecha) for fecha in df['FECHA'].tolist()]
+                valores = df['VALOR'].tolist()
+            
+            # Para cada candidato tomar, dentro de su rango, el más reciente con el mismo valor
+            # (exacto y luego por valor absoluto), igual que la consulta individual
+            resultados = {}
+            for candidato, (nit, fecha_inicio, fecha_fin) in candidatos_formateados.items():
+                valor_descuadre = candidato[2]
+                posiciones = [
+                    p for p in posiciones_por_nit.get(nit, [])
+                    if fecha_inicio <= fechas_movimiento[p] <= fecha_fin
+                ]
+                posicion = next((p for p in posiciones if valores[p] == valor_descuadre), None)
+                if posicion is None:
+                    posicion = next((p for p in posiciones if abs(valores[p]) == abs(valor_descuadre)), None)
+                resultados[candidato] = df.iloc[posicion].to_dict() if posicion is not None else None
+            
+            logger.info(
+                f"Movimientos NACIONAL del día del arqueo consultados en lote: "
+                f"{sum(1 for r in resultados.values() if r is not None)} de {len(resultados)} encontrados"
+            )
+            
+            return resultados
+        
+        except Exception as e:
+            logger.error(f"Error al consultar movimientos NACIONAL en lote en BD: {e}")
+            return None
+    
     def consultar_provision(
         self,
         codigo_cajero: int,
@@ -336,6 +499,90 @@ class ConsultorBD:
             logger.error(f"Error al consultar provisión en BD: {e}")
             return None
     
+    def consultar_provisiones_lote(
+        self,
+        candidatos: List[tuple],
+        cuenta: int = 110505075,
+        codofi_excluir: int = 976,
+        nrocmp_provision: int = 810291
+    ) -> Optional[Dict[tuple, Optional[Dict[str, Any]]]]:
+        """
+        Consulta en una sola ida a la base de datos las provisiones (NROCMP = 810291)
+        del día anterior al arqueo para varios cajeros.
+        
+        Equivale a llamar a consultar_provision por cada candidato, pero con una
+        única consulta que filtra por NIT IN (...) y FECHA IN (...).
+        
+        Args:
+            candidatos: Lista de tuplas (codigo_cajero, fecha_arqueo, valor_sobrante) con la
+                fecha en formato YYYY-MM-DD
+            cuenta: Número de cuenta (default: 110505075)
+            codofi_excluir: Código de oficina a excluir (default: 976)
+            nrocmp_provision: Número de comprobante de provisión (default: 810291)
+        
+        Returns:
+            Diccionario {(codigo_cajero, fecha_arqueo, valor_sobrante): provisión o None} con
+            una entrada por cada candidato, o None si no se pudo realizar la consulta
+        """
+        if not self.admin_bd:
+            logger.error("No se ha configurado el administrador de BD")
+            return None
+        
+        if not candidatos:
+            return {}
+        
+        try:
+            # Formatear el día anterior al arqueo a YYYYMMDD (entero) para cada candidato
+            candidatos_formateados = {}
+            for codigo_cajero, fecha_arqueo, valor_sobrante in candidatos:
+                fecha_anterior = datetime.strptime(fecha_arqueo, '%Y-%m-%d') - timedelta(days=1)
+                candidatos_formateados[(codigo_cajero, fecha_arqueo, valor_sobrante)] = (
+                    int(codigo_cajero),
+                    int(fecha_anterior.strftime('%Y%m%d'))
+                )
+            nits = sorted({nit for nit, _ in candidatos_formateados.values()})
+            fechas = sorted({fecha for _, fecha in candidatos_formateados.values()})
+            
+            logger.debug(
+                f"Consultando provisiones día anterior en lote para {len(candidatos_formateados)} "
+                f"candidatos ({len(nits)} cajeros, {len(fechas)} fechas)"
+            )
+            
+            # Ejecutar consulta
+            df = self._consultar_movimientos_lote(cuenta, codofi_excluir, nrocmp_provision, nits, fechas)
+            
+            # Agrupar las provisiones por (NIT, FECHA), ordenadas de mayor a menor valor absoluto
+            provisiones_por_clave = {}
+            if not df.empty:
+                df = df.sort_values('VALOR', key=lambda x: x.abs(), ascending=False)
+                for registro in df.to_dict('records'):
+                    clave = (int(registro['NIT']), int(registro['FECHA']))
+                    provisiones_por_clave.setdefault(clave, []).append(registro)
+            
+            # Para cada candidato tomar la de mayor valor que sea <= al sobrante,
+            # igual que la consulta individual
+            resultados = {}
+            for candidato, clave in candidatos_formateados.items():
+                valor_sobrante_abs = abs(candidato[2])
+                resultados[candidato] = next(
+                    (
+                        registro for registro in provisiones_por_clave.get(clave, [])
+                        if abs(registro['VALOR']) <= valor_sobrante_abs
+                    ),
+                    None
+                )
+            
+            logger.info(
+                f"Provisiones día anterior consultadas en lote: "
+                f"{sum(1 for r in resultados.values() if r is not None)} de {len(resultados)} encontradas"
+            )
+            
+            return resultados
+        
+        except Exception as e:
+            logger.error(f"Error al consultar provisiones día anterior en lote en BD: {e}")
+            return None
+    
     def consultar_provision_mismo_dia(
         self,
         codigo_cajero: int,
@@ -421,6 +668,83 @@ class ConsultorBD:
             logger.error(f"Error al consultar provisión mismo día en BD: {e}")
             return None
     
+    def consultar_provisiones_mismo_dia_lote(
+        self,
+        pares_cajero_fecha: List[tuple],
+        cuenta: int = 110505075,
+        codofi_excluir: int = 976,
+        nrocmp_provision: int = 810291
+    ) -> Optional[Dict[tuple, Optional[Dict[str, Any]]]]:
+        """
+        Consulta en una sola ida a la base de datos las provisiones (NROCMP = 810291)
+        del mismo día del arqueo para varios cajeros.
+        
+        Equivale a llamar a consultar_provision_mismo_dia por cada par, pero con una
+        única consulta que filtra por NIT IN (...) y FECHA IN (...).
+        
+        Args:
+            pares_cajero_fecha: Lista de tuplas (codigo_cajero, fecha_arqueo) con la fecha
+                en formato YYYY-MM-DD
+            cuenta: Número de cuenta (default: 110505075)
+            codofi_excluir: Código de oficina a excluir (default: 976)
+            nrocmp_provision: Número de comprobante de provisión (default: 810291)
+        
+        Returns:
+            Diccionario {(codigo_cajero, fecha_arqueo): provisión o None} con una entrada
+            por cada par solicitado, o None si no se pudo realizar la consulta
+        """
+        if not self.admin_bd:
+            logger.error("No se ha configurado el administrador de BD")
+            return None
+        
+        if not pares_cajero_fecha:
+            return {}
+        
+        try:
+            # Formatear fechas a YYYYMMDD (entero) para cada par solicitado
+            pares_formateados = {
+                (codigo_cajero, fecha_arqueo): (
+                    int(codigo_cajero),
+                    int(datetime.strptime(fecha_arqueo, '%Y-%m-%d').strftime('%Y%m%d'))
+                )
+                for codigo_cajero, fecha_arqueo in pares_cajero_fecha
+            }
+            nits = sorted({nit for nit, _ in pares_formateados.values()})
+            fechas = sorted({fecha for _, fecha in pares_formateados.values()})
+            
+            logger.debug(
+                f"Consultando provisiones mismo día en lote para {len(pares_formateados)} "
+                f"pares cajero/fecha ({len(nits)} cajeros, {len(fechas)} fechas)"
+            )
+            
+            # Ejecutar consulta
+            df = self._consultar_movimientos_lote(cuenta, codofi_excluir, nrocmp_provision, nits, fechas)
+            
+            # Para cada (NIT, FECHA) tomar el de mayor valor, igual que la consulta individual
+            encontradas = {}
+            if not df.empty:
+                df = df.sort_values('VALOR', key=lambda x: x.abs(), ascending=False)
+                for registro in df.to_dict('records'):
+                    clave = (int(registro['NIT']), int(registro['FECHA']))
+                    if clave not in encontradas:
+                        encontradas[clave] = registro
+            
+            resultados = {
+                par: encontradas.get(par_formateado)
+                for par, par_formateado in pares_formateados.items()
+            }
+            
+            logger.info(
+                f"Provisiones mismo día consultadas en lote: "
+                f"{sum(1 for r in resultados.values() if r is not None)} de {len(resultados)} encontradas"
+            )
+            
+            return resultados
+        
+        except Exception as e:
+            logger.error(f"Error al consultar provisiones mismo día en lote en BD: {e}")
+            return None
+    
     def consultar_movimientos_negativos_mismo_dia(
         self,
         codigo_cajero: int,
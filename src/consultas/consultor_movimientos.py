@@ -270,6 +270,14 @@ class ConsultorMovimientos:
                             if fecha_normalizada:
                                 self._df_historico_cuadre.loc[idx, 'fecha_arqueo'] = fecha_normalizada.strftime('%Y-%m-%d')
                 
+                # Convertir fecha_arqueo a datetime una sola vez; las búsquedas filtran y ordenan
+                # por esta columna en lugar de volver a convertir todo el histórico en cada llamada
+                if 'fecha_arqueo' in self._df_historico_cuadre.columns:
+                    self._df_historico_cuadre['fecha_arqueo_dt'] = pd.to_datetime(
+                        self._df_historico_cuadre['fecha_arqueo'],
+                        errors='coerce'
+                    )
+                
                 logger.info(f"Archivo histórico cargado: {len(self._df_historico_cuadre)} registros")
                 
             except Exception as e:
@@ -311,12 +319,8 @@ class ConsultorMovimientos:
             if fecha_arqueo:
                 try:
                     fecha_obj = datetime.strptime(fecha_arqueo, '%Y-%m-%d')
-                    # Convertir fecha_arqueo del DataFrame a datetime para comparar
-                    df_historico['fecha_arqueo_dt'] = pd.to_datetime(
-                        df_historico['fecha_arqueo'],
-                        errors='coerce'
-                    )
-                    filtro = filtro & (df_historico['fecha_arqueo_dt'].dt.date == fecha_obj.date())
+                    # Comparar solo el día (fecha_arqueo_dt se calcula al cargar el histórico)
+                    filtro = filtro & (df_historico['fecha_arqueo_dt'].dt.normalize() == fecha_obj)
                 except Exception as e:
                     logger.debug(f"Error al filtrar por fecha: {e}")
             
@@ -392,15 +396,9 @@ class ConsultorMovimientos:
             if tipo_registro:
                 filtro = filtro & (df_historico['tipo_registro'] == tipo_registro)
             
-            # Convertir fecha_arqueo del DataFrame a datetime para comparar
-            df_historico['fecha_arqueo_dt'] = pd.to_datetime(
-                df_historico['fecha_arqueo'],
-                errors='coerce'
-            )
-            
-            # Filtrar por fechas (convertir fechas a date para comparar)
-            fechas_date = [fecha.date() for fecha in fechas]
-            filtro_fechas = df_historico['fecha_arqueo_dt'].dt.date.isin(fechas_date)
+            # Filtrar por fechas comparando solo el día (fecha_arqueo_dt se calcula al cargar el histórico)
+            fechas_dia = [pd.Timestamp(fecha.date()) for fecha in fechas]
+            filtro_fechas = df_historico['fecha_arqueo_dt'].dt.normalize().isin(fechas_dia)
             filtro = filtro & filtro_fechas
             
             resultados = df_historico[filtro]
@@ -458,13 +456,7 @@ class ConsultorMovimientos:
             if tipo_registro:
                 filtro = filtro & (df_historico['tipo_registro'] == tipo_registro)
             
-            # Convertir fecha_arqueo del DataFrame a datetime para ordenar
-            df_historico['fecha_arqueo_dt'] = pd.to_datetime(
-                df_historico['fecha_arqueo'],
-                errors='coerce'
-            )
-            
-            # Aplicar filtro
+            # Aplicar filtro (se ordena por fecha_arqueo_dt, calculada al cargar el histórico)
             resultados = df_historico[filtro].copy()
             
             if len(resultados) == 0:
@@ -5,6 +5,9 @@ Utilidades para calcular días hábiles y determinar qué registros procesar.
 from datetime import datetime, timedelta
 import logging
 
+import numpy as np
+import pandas as pd
+
 try:
     import holidays_co
     TIENE_HOLIDAYS_CO = True
@@ -224,3 +227,59 @@ def debe_procesar_registro(
     # Si no está en ninguna lista, no procesar
     return False
 
+
+def debe_procesar_registros(
+    fechas_arqueo: pd.Series,
+    tiene_sobrante: np.ndarray,
+    tiene_faltante: np.ndarray,
+    fecha_proceso: datetime
+) -> np.ndarray:
+    """
+    Versión vectorizada de debe_procesar_registro para una columna completa.
+    Calcula las fechas a procesar una sola vez y evalúa todos los registros con máscaras.
+    
+    Args:
+        fechas_arqueo: Serie con las fechas de arqueo (datetime o texto)
+        tiene_sobrante: Arreglo booleano, True si el registro tiene sobrante
+        tiene_faltante: Arreglo booleano, True si el registro tiene faltante
+        fecha_proceso: Fecha actual del proceso
+        
+    Returns:
+        Arreglo booleano con True para los registros que deben ser procesados
+    """
+    fechas_info = obtener_fechas_a_procesar(fecha_proceso)
+    
+    # Convertir las fechas de texto con los mismos formatos que debe_procesar_registro
+    es_texto = np.fromiter(
+        (isinstance(v, str) for v in fechas_arqueo), dtype=bool, count=len(fechas_arqueo)
+    )
+    fechas = pd.Series(pd.NaT, index=fechas_arqueo.index, dtype='datetime64[ns]')
+    if es_texto.any():
+        textos = fechas_arqueo[es_texto]
+        parseadas = pd.to_datetime(textos, format='%Y-%m-%d', errors='coerce')
+        sin_formato = parseadas.isna()
+        if sin_formato.any():
+            parseadas[sin_formato] = pd.to_datetime(
+                textos[sin_formato], format='%Y-%m-%d %H:%M:%S', errors='coerce'
+            )
+        fechas[es_texto] = parseadas
+    if not es_texto.all():
+        fechas[~es_texto] = pd.to_datetime(fechas_arqueo[~es_texto], errors='coerce')
+    
+    # Por defecto, procesar si no se puede determinar la fecha
+    sin_parsear = es_texto & fechas.isna().to_numpy()
+    if sin_parsear.any():
+        logger.warning(
+            f"No se pudo parsear fecha_arqueo en {int(sin_parsear.sum())} registro(s): "
+            f"{fechas_arqueo[sin_parsear].unique().tolist()}"
+        )
+    
+    # Normalizar a solo fecha (sin hora) y verificar en qué lista de fechas está cada registro
+    fechas = fechas.dt.normalize()
+    en_arqueo_diario = fechas.isin(fechas_info['fechas_arqueo_diario']).to_numpy()
+    en_solo_sobrantes = fechas.isin(fechas_info['fechas_solo_sobrantes']).to_numpy()
+    
+    # En fechas de solo SOBRANTES, procesar únicamente si tiene sobrante (no faltante)
+    return sin_parsear | en_arqueo_diario | (
+        en_solo_sobrantes & np.asarray(tiene_sobrante, dtype=bool) & ~np.asarray(tiene_faltante, dtype=bool)
+    )